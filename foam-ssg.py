@@ -6,6 +6,7 @@ A Python-based static site generator with graph visualization, search, and diagr
 
 import os
 import re
+import sys
 import json
 import shutil
 import argparse
@@ -15,297 +16,32 @@ import hashlib
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import markdown
 from markdown.extensions import fenced_code
 import frontmatter
 from jinja2 import Environment, FileSystemLoader
 import networkx as nx
-from bs4 import BeautifulSoup
 
-class FoamSSG:
-    def __init__(self, input_dir, output_dir):
-        self.input_dir = Path(input_dir)
-        self.output_dir = Path(output_dir)
-        self.notes = {}
-        self.graph = nx.DiGraph()
-        self.backlinks = defaultdict(list)
-        self.md = markdown.Markdown(extensions=[
-            'fenced_code',
-            'tables',
-            'toc',
-            'meta',
-            'codehilite'
-        ])
-        
-    def build(self):
-        """Main build process"""
-        print("🚀 Starting Foam SSG build...")
-        
-        # Clean output directory
-        if self.output_dir.exists():
-            shutil.rmtree(self.output_dir)
-        self.output_dir.mkdir(parents=True)
-        
-        # Process all markdown files
-        self.process_notes()
-        
-        # Generate site
-        self.generate_html()
-        self.generate_search_index()
-        self.copy_assets()
-        
-        print("✅ Build complete!")
-        
-    def process_notes(self):
-        """Process all markdown files and build graph"""
-        # First pass: Load all notes without processing wiki links
-        for md_file in self.input_dir.rglob("*.md"):
-            relative_path = md_file.relative_to(self.input_dir)
-            note_id = str(relative_path.with_suffix(''))
-            
-            # Read frontmatter and content
-            with open(md_file, 'r', encoding='utf-8') as f:
-                post = frontmatter.load(f)
-            
-            # Extract links but don't process wiki links yet
-            content = post.content
-            links = self.extract_links(content)
-            
-            # Store note data with raw content
-            self.notes[note_id] = {
-                'id': note_id,
-                'title': post.get('title', md_file.stem),
-                'content': content,
-                'html': '',  # Will be populated in second pass
-                'metadata': post.metadata,
-                'links': links,
-                'backlinks': [],
-                'path': str(relative_path),
-                'url': f"{note_id}.html"
-            }
-            
-            # Add to graph
-            self.graph.add_node(note_id)
-            for link in links:
-                self.graph.add_edge(note_id, link)
-                self.backlinks[link].append(note_id)
-        
-        # Second pass: Process wiki links and generate HTML now that all notes are loaded
-        for note_id, note in self.notes.items():
-            html_content = self.process_markdown(note['content'], note_id)
-            note['html'] = html_content
-        
-        # Update backlinks
-        for note_id, note in self.notes.items():
-            note['backlinks'] = self.backlinks.get(note_id, [])
-    
-    def extract_links(self, content):
-        """Extract wiki-style links from content"""
-        # Match [[link]] and [[link|alias]] patterns
-        wiki_link_pattern = r'\[\[([^\]]+)\]\]'
-        links = []
-        
-        for match in re.finditer(wiki_link_pattern, content):
-            link = match.group(1).strip()
-            
-            # Handle pipe syntax for aliases
-            if '|' in link:
-                link = link.split('|', 1)[0].strip()
-            
-            # Handle title#heading syntax - extract just the title part for graph links
-            if '#' in link:
-                link = link.split('#', 1)[0].strip()
-            
-            # Normalize link (remove .md extension if present)
-            if link.endswith('.md'):
-                link = link[:-3]
-            links.append(link)
-        
-        return list(set(links))  # Remove duplicates
-    
-    def remove_link_reference_sections(self, content):
-        """Remove [//begin] and [//end] sections used for other parsers"""
-        lines = content.split('\n')
-        result_lines = []
-        inside_reference_section = False
-        
-        for line in lines:
-            # Check if this line starts a reference section
-            if line.strip().startswith('[//begin]'):
-                inside_reference_section = True
-                continue  # Skip this line
-            
-            # Check if this line ends a reference section
-            if line.strip().startswith('[//end]'):
-                inside_reference_section = False
-                continue  # Skip this line
-            
-            # If we're not inside a reference section, keep the line
-            if not inside_reference_section:
-                result_lines.append(line)
-        
-        return '\n'.join(result_lines).strip()
-    
-    def process_markdown(self, content, note_id):
-        """Process markdown with special handling for diagrams and links"""
-        # Remove [//begin] and [//end] sections for markdown compatibility
-        content = self.remove_link_reference_sections(content)
-        
-        # Process wiki links
-        content = self.process_wiki_links(content, note_id)
-        
-        # Process diagrams
-        content = self.process_diagrams(content, note_id)
-        
-        # Convert to HTML
-        html = self.md.convert(content)
-        
-        return html
-    
-    def process_wiki_links(self, content, current_note_id):
-        """Convert wiki links to HTML links"""
-        def replace_link(match):
-            full_match = match.group(0)
-            link = match.group(1).strip()
-            alias = None
-            anchor = None
-            
-            # Handle pipe syntax for aliases
-            if '|' in link:
-                parts = link.split('|', 1)
-                link = parts[0].strip()
-                alias = parts[1].strip()
-            
-            # Handle title#heading syntax
-            if '#' in link:
-                link_parts = link.split('#', 1)
-                link = link_parts[0].strip()
-                anchor = link_parts[1].strip()
-            
-            if not alias:
-                alias = full_match[2:-2]  # Use original text as alias
-            
-            # Normalize link
-            if link.endswith('.md'):
-                link = link[:-3]
-            
-            # Check if target exists
-            if link in self.notes:
-                # Calculate relative path from current note to target
-                relative_path = self.get_relative_path(current_note_id, link)
-                # Add anchor if present
-                if anchor:
-                    # Convert heading to URL-friendly anchor
-                    anchor_id = anchor.lower().replace(' ', '-').replace('/', '').replace('\\', '')
-                    # Remove non-alphanumeric characters except hyphens and underscores
-                    anchor_id = re.sub(r'[^a-zA-Z0-9\-_]', '', anchor_id)
-                    relative_path += f'#{anchor_id}'
-                return f'<a href="{relative_path}" class="wiki-link">{alias}</a>'
-            else:
-                return f'<span class="wiki-link broken" title="Note not found: {link}">{alias}</span>'
-        
-        # Match [[link]] and [[link|alias]] patterns
-        wiki_link_pattern = r'\[\[([^\]]+)\]\]'
-        return re.sub(wiki_link_pattern, replace_link, content)
-    
-    def get_relative_path(self, from_note_id, to_note_id):
-        """Calculate relative path from one note to another"""
-        from pathlib import Path
-        
-        # Convert note IDs to paths
-        from_path = Path(from_note_id + '.html')
-        to_path = Path(to_note_id + '.html')
-        
-        # Calculate relative path
-        try:
-            # Get the relative path from from_path to to_path
-            relative_path = Path('..') / to_path if from_path.parent != Path('.') else to_path
-            
-            # Handle different directory levels
-            from_parts = from_path.parts[:-1]  # Exclude filename
-            to_parts = to_path.parts[:-1]      # Exclude filename
-            
-            # Count how many levels to go up
-            up_levels = len(from_parts)
-            
-            # Build the relative path
-            if up_levels == 0:
-                # Both in root
-                return str(to_path)
-            else:
-                # Need to go up and then down
-                up_dirs = '../' * up_levels
-                return f"{up_dirs}{to_note_id}.html"
-                
-        except Exception:
-            # Fallback to absolute-style path
-            return f"{to_note_id}.html"
-    
-    def get_relative_diagram_path(self, from_note_id, img_filename):
-        """Calculate relative path from a note to a diagram image"""
-        from pathlib import Path
-        
-        # Convert note ID to path
-        from_path = Path(from_note_id + '.html')
-        
-        # Calculate relative path from note to diagrams directory
-        try:
-            # Calculate the path from the note's location to the root diagrams directory
-            # For projects/foam-ssg.html -> ../diagrams/...
-            # For index.html -> diagrams/...
-            from_dir = from_path.parent
-            
-            # Build the relative path by going up the necessary levels
-            if from_dir == Path('.'):
-                # Note is in root directory
-                return f"diagrams/{img_filename}"
-            else:
-                # Note is in a subdirectory, need to go up to root
-                levels_up = len(from_dir.parts)
-                up_path = '../' * levels_up
-                return f"{up_path}diagrams/{img_filename}"
-        
-        except Exception:
-            # Fallback to absolute-style path
-            return f"diagrams/{img_filename}"
-    
-    def process_diagrams(self, content, note_id):
-        """Process Mermaid and PlantUML diagrams"""
-        # Process Mermaid
-        mermaid_pattern = r'```mermaid\n(.*?)\n```'
-        content = re.sub(mermaid_pattern, self.render_mermaid, content, flags=re.DOTALL)
-        
-        # Process PlantUML
-        plantuml_pattern = r'```plantuml\s*\n(.*?)\n```'
-        content = re.sub(plantuml_pattern, lambda m: self.render_plantuml(m, note_id), content, flags=re.DOTALL)
-        
-        return content
-    
-    def render_mermaid(self, match):
-        """Render Mermaid diagrams (client-side)"""
-        diagram_code = match.group(1)
-        return f'<div class="mermaid">\n{diagram_code}\n</div>'
-    
-    def render_plantuml(self, match, note_id):
-        """Render PlantUML diagrams (pre-rendered at build time)"""
-        diagram_code = match.group(1)
-        
-        # Create diagrams directory
-        diagrams_dir = self.output_dir / 'diagrams'
-        diagrams_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Generate unique filename including theme version to force regeneration
-        theme_version = "dark_v5"  # Increment when theme changes
-        combined_content = f"{diagram_code}_{theme_version}"
-        diagram_hash = hashlib.md5(combined_content.encode()).hexdigest()
-        img_filename = f'plantuml_{note_id}_{diagram_hash}.png'
-        img_path = diagrams_dir / img_filename
-        
-        # Try to render with PlantUML if available
-        try:
-            # Write PlantUML code to temp file with dark theme
-            # Add comprehensive dark theme directives to match CSS styles
-            dark_theme_code = f'''@startuml
+try:
+    import orjson
+except ImportError:  # optional accelerator; stdlib json works fine without it
+    orjson = None
+
+def _json_dumps(obj):
+    """Serialize to compact UTF-8 JSON bytes, via orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+# Build-cache format version. Bump when process_markdown output changes
+# (wiki-link markup, diagram handling, markdown extensions) so stale HTML
+# is never reused across incompatible versions.
+_CACHE_VERSION = 2
+
+# Dark-theme preamble prepended to every PlantUML diagram, matching the CSS
+# styles. Built once here instead of re-assembled per diagram.
+_PLANTUML_DARK_HEADER = '''@startuml
 skinparam backgroundColor #1e1e1e
 skinparam defaultTextColor #d4d4d4
 skinparam shadowing false
@@ -389,230 +125,689 @@ skinparam stereotypeABackgroundColor #2d2d30
 skinparam stereotypeIBackgroundColor #2d2d30
 skinparam stereotypeEBackgroundColor #2d2d30
 
-{diagram_code}
-@enduml'''
-            
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.puml', delete=False) as temp_file:
-                temp_file.write(dark_theme_code)
-                temp_file.flush()  # Ensure content is written
-                temp_filename = temp_file.name
-            
-            # Run PlantUML (try different common commands)
-            import os
-            env = os.environ.copy()
-            
-            for cmd in ['plantuml', 'java -jar plantuml.jar']:
-                try:
-                    result = subprocess.run(
-                        f'{cmd} -tpng -o "{diagrams_dir.absolute()}" "{temp_filename}"',
-                        shell=True,
-                        capture_output=True,
-                        text=True,
-                        env=env
-                    )
-                    if result.returncode == 0:
-                        break
-                except Exception as e:
+'''
+
+# Precompiled patterns shared by the per-note processing methods. Hoisting
+# these avoids re-parsing the pattern strings on every call in the hot
+# per-note loops. Target/anchor/alias are captured in one shot so the
+# per-match handler doesn't need to re-split and re-strip the link text.
+_WIKI_LINK_RE = re.compile(
+    r'\[\[\s*(?P<target>[^\]|#]+?)'
+    r'(?:#(?P<anchor>[^\]|]+))?'
+    r'(?:\|(?P<alias>[^\]]+))?\]\]'
+)
+_ANCHOR_STRIP_RE = re.compile(r'[^a-zA-Z0-9\-_]')
+_ANCHOR_TABLE = str.maketrans({' ': '-', '/': None, '\\': None})
+_PREVIEW_FENCE_RE = re.compile(r'```.*?(?:```|\Z)', re.DOTALL)
+_PREVIEW_WS_RE = re.compile(r'\s+')
+
+def _strip_for_preview(content):
+    """Reduce raw markdown to plain text suitable for a search preview.
+
+    Fenced code blocks and wiki-link brackets are noise in a preview
+    snippet, so drop them and collapse runs of whitespace.
+    """
+    text = _PREVIEW_FENCE_RE.sub(' ', content)
+    text = text.replace('[[', '').replace(']]', '')
+    return _PREVIEW_WS_RE.sub(' ', text).strip()
+
+def _iter_md_files(root):
+    """Yield markdown file paths under root using os.scandir.
+
+    scandir caches entry type info from the directory read, avoiding the
+    per-entry stat calls Path.rglob pays. Hidden files and directories
+    are skipped inline.
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
                     continue
-            
-            # Check if image was generated (PlantUML generates with temp filename in output directory)
-            generated_img = diagrams_dir / f'{Path(temp_filename).stem}.png'
-            if generated_img.exists():
-                # Ensure the parent directory exists for the target path
-                img_path.parent.mkdir(parents=True, exist_ok=True)
-                # Rename to our desired filename
-                generated_img.rename(img_path)
-                # Clean up temp file
-                Path(temp_filename).unlink(missing_ok=True)
-                # Calculate relative path to diagrams directory from current note
-                relative_img_path = self.get_relative_diagram_path(note_id, img_filename)
-                return f'<img src="{relative_img_path}" alt="PlantUML diagram" class="plantuml-diagram">'
-                
-            # Clean up temp file
-            Path(temp_filename).unlink(missing_ok=True)
-            
-        except Exception as e:
-            print(f"Warning: Could not render PlantUML diagram: {e}")
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.md'):
+                    yield Path(entry.path)
+
+# Per-process renderer used by the render pool. Markdown instances aren't
+# picklable (and accumulate state between convert calls), so each worker
+# process builds its own renderer once via the pool initializer.
+_worker_ssg = None
+
+def _init_render_worker(ssg_cls, input_dir, output_dir, note_ids):
+    """Set up a fresh renderer in each worker process"""
+    global _worker_ssg
+    # Instantiate the concrete class so subclasses that customize the
+    # markdown pipeline (e.g. swapping preprocessors) render with it
+    _worker_ssg = ssg_cls(input_dir, output_dir)
+    # Only the note ids are needed for broken-link detection, not full contents
+    _worker_ssg.notes = dict.fromkeys(note_ids)
+
+def _render_note(payload):
+    """Render one note's markdown to HTML (runs in a worker process)"""
+    note_id, content = payload
+    _worker_ssg._pending_diagrams.clear()
+    html, links = _worker_ssg.process_markdown(content, note_id)
+    # Queued diagrams travel back so the parent can batch-render them
+    return note_id, html, links, list(_worker_ssg._pending_diagrams)
+
+# Per-process state for the page-rendering pool: the compiled template and
+# the slim title map the links tab reads out of all_notes, both built once
+# per worker by the initializer.
+_worker_template = None
+_worker_titles = None
+_worker_output_dir = None
+
+def _init_page_worker(ssg_cls, output_dir, titles):
+    """Compile the page template once in each worker process"""
+    global _worker_template, _worker_titles, _worker_output_dir
+    # create_template only touches class state, so a bare instance of the
+    # concrete class suffices — and honors a subclass template override
+    _worker_template = ssg_cls.__new__(ssg_cls).create_template()
+    _worker_titles = titles
+    _worker_output_dir = Path(output_dir)
+
+def _render_page(payload):
+    """Render one note page and write it (runs in a worker process).
+
+    Workers own the file write so the finished HTML never travels back
+    over the result pipe.
+    """
+    note_id, note, base_prefix = payload
+    html = _worker_template.render(
+        note=note,
+        all_notes=_worker_titles,
+        current_note_id=note_id,
+        base_prefix=base_prefix,
+        is_index=False
+    )
+    (_worker_output_dir / f"{note_id}.html").write_bytes(html.encode('utf-8'))
+
+class FoamSSG:
+    # Characters of stripped note content shipped per search entry;
+    # subclasses may override (the extended SSG wires this to its config)
+    search_preview_length = 200
+
+    def __init__(self, input_dir, output_dir):
+        self.input_dir = Path(input_dir)
+        self.output_dir = Path(output_dir)
+        self.notes = {}
+        self.graph = nx.DiGraph()
+        self.backlinks = defaultdict(list)
+        self._edges = []  # deduplicated graph edges, built in process_notes
+        self._up_prefixes = {}  # directory depth -> '../' climb prefix
+        self._cache = {}  # previous build's cache, loaded in build()
+        self._tree_structure = None  # file tree, built once per build
+        self._pending_diagrams = []  # (code, filename) queued for batch render
+        self._plantuml = None  # PlantUML launch argv, discovered on first use
+        self._plantuml_checked = False
+        self.md = markdown.Markdown(extensions=[
+            'fenced_code',
+            'tables',
+            'toc',
+            'meta',
+            'codehilite'
+        ])
         
-        # Fallback: render as code block with note to install PlantUML
-        return f'''<div class="plantuml-fallback">
+    def build(self):
+        """Main build process"""
+        print("🚀 Starting Foam SSG build...")
+
+        # Reuse the previous build's output instead of wiping it: the cache
+        # lets unchanged notes skip markdown rendering entirely
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._cache = self._load_build_cache()
+
+        # Process all markdown files
+        self.process_notes()
+
+        # Remove outputs left over from notes deleted since the last build
+        for stale_id in set(self._cache.get('notes', {})) - set(self.notes):
+            (self.output_dir / f"{stale_id}.html").unlink(missing_ok=True)
+
+        # Generate site. The data files, search index, and asset copy only
+        # depend on self.notes, so they run on threads alongside the HTML
+        # emission; the copies and writes release the GIL
+        with ThreadPoolExecutor() as executor:
+            futures = [
+                executor.submit(self.generate_html),
+                executor.submit(self.generate_data_files),
+                executor.submit(self.generate_search_index),
+                executor.submit(self.copy_assets),
+            ]
+            for future in futures:
+                future.result()
+        self._save_build_cache()
+
+        print("✅ Build complete!")
+        
+    def process_notes(self):
+        """Process all markdown files and build graph"""
+        # First pass: Load all notes without processing wiki links
+        for md_file in _iter_md_files(self.input_dir):
+            relative_path = md_file.relative_to(self.input_dir)
+            # Interned ids make the frequent dict lookups and edge-tuple
+            # hashing pointer comparisons
+            note_id = sys.intern(str(relative_path.with_suffix('')))
+            depth = note_id.count('/') + note_id.count('\\')
+            up_prefix = self._up_prefixes.get(depth)
+            if up_prefix is None:
+                up_prefix = self._up_prefixes[depth] = '../' * depth
+
+            # Read each file with a single read() and parse frontmatter from
+            # the string, avoiding frontmatter's file-object wrapping
+            raw_bytes = md_file.read_bytes()
+            post = frontmatter.loads(raw_bytes.decode('utf-8'))
+
+            # Store note data with raw content
+            self.notes[note_id] = {
+                'id': note_id,
+                'title': post.get('title', md_file.stem),
+                'content': post.content,
+                'html': '',  # Will be populated in second pass
+                'metadata': post.metadata,
+                'links': [],
+                'backlinks': [],
+                'path': str(relative_path),
+                'url': f"{note_id}.html",
+                'src_hash': hashlib.blake2b(raw_bytes, digest_size=16).hexdigest(),
+                '_preview': _strip_for_preview(post.content)[:self.search_preview_length],
+                '_depth': depth,
+                '_up_prefix': up_prefix
+            }
+
+        # Cached HTML embeds relative link paths and broken-link markers for
+        # the whole note set, so any change to the set of note ids
+        # invalidates it wholesale. It also bakes in whether PlantUML was
+        # installed (fallback blocks vs <img> tags), so availability is
+        # folded into the fingerprint: installing or removing PlantUML
+        # re-renders everything instead of serving stale markup forever.
+        plantuml_state = 'plantuml' if self._find_plantuml() else 'no-plantuml'
+        self._fingerprint = hashlib.blake2b(
+            '\n'.join(sorted(self.notes) + [plantuml_state]).encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
+        cached_notes = {}
+        if self._cache.get('fingerprint') == self._fingerprint:
+            cached_notes = self._cache.get('notes', {})
+
+        # Serve unchanged notes straight from the cache
+        for note_id, note in self.notes.items():
+            entry = cached_notes.get(note_id)
+            if entry is not None and entry['src_hash'] == note['src_hash']:
+                note['links'] = entry['links']
+                note['html'] = entry['html']
+                note['_diagrams'] = entry.get('diagrams', [])
+                # Re-queue the note's diagrams: any whose image vanished
+                # from the output gets regenerated, the rest are skipped
+                self._pending_diagrams.extend(
+                    (code, fname) for code, fname in note['_diagrams']
+                )
+
+        # Second pass: Render notes that missed the cache now that all note
+        # ids are known. The preprocessing scan yields each note's HTML and
+        # outgoing links together, and each note renders independently, so
+        # fan the CPU-bound conversion out across cores with a process pool.
+        payloads = [(note_id, note['content'])
+                    for note_id, note in self.notes.items() if not note['html']]
+        if payloads:
+            with ProcessPoolExecutor(
+                initializer=_init_render_worker,
+                initargs=(type(self), self.input_dir, self.output_dir,
+                          list(self.notes.keys()))
+            ) as executor:
+                for note_id, html_content, links, pending in executor.map(_render_note, payloads, chunksize=32):
+                    self.notes[note_id]['html'] = html_content
+                    self.notes[note_id]['links'] = links
+                    # Kept on the note so cache hits can re-queue them
+                    self.notes[note_id]['_diagrams'] = pending
+                    self._pending_diagrams.extend(pending)
+
+        # Render every queued PlantUML diagram in one go
+        self._render_pending_diagrams()
+
+        # Build the link graph now that every note's links are resolved. The
+        # deduplicated edge list for the visualization is built in the same
+        # walk since it never changes afterwards.
+        edge_seen = set()
+        for note_id, note in self.notes.items():
+            self.graph.add_node(note_id)
+            for link in note['links']:
+                self.graph.add_edge(note_id, link)
+                self.backlinks[link].append(note_id)
+                if link in self.notes and (note_id, link) not in edge_seen:
+                    edge_seen.add((note_id, link))
+                    self._edges.append((note_id, link))
+        
+        # Update backlinks
+        for note_id, note in self.notes.items():
+            note['backlinks'] = self.backlinks.get(note_id, [])
+    
+    def process_markdown(self, content, note_id):
+        """Process markdown with special handling for diagrams and links.
+
+        Returns the rendered HTML and the note's outgoing links.
+        """
+        content, links = self._preprocess(content, note_id)
+
+        # Convert to HTML. reset() clears state the extensions (toc, meta)
+        # accumulate across convert() calls, which both leaks between notes
+        # and grows redundant work as the build progresses.
+        self.md.reset()
+        html = self.md.convert(content)
+
+        return html, links
+
+    def _preprocess(self, content, current_note_id):
+        """Single pass over a note's markdown before conversion.
+
+        Strips [//begin]/[//end] reference sections, converts wiki links to
+        HTML, renders mermaid/plantuml fences, and collects outgoing links —
+        one scan and one output allocation instead of a separate full-content
+        walk (and full-size string copy) per concern.
+        """
+        links = []
+        links_append = links.append
+        notes = self.notes
+
+        def replace_link(match):
+            # target/anchor/alias come pre-split from the pattern's named groups
+            link = match.group('target').rstrip()
+            anchor = match.group('anchor')
+            alias = match.group('alias')
+
+            if alias:
+                alias = alias.strip()
+            else:
+                alias = match.group(0)[2:-2]  # Use original text as alias
+
+            # Normalize link
+            if link.endswith('.md'):
+                link = link[:-3]
+            links_append(link)
+
+            # Check if target exists
+            if link in notes:
+                # Calculate relative path from current note to target
+                relative_path = self.get_relative_path(current_note_id, link)
+                # Add anchor if present
+                if anchor:
+                    # Convert heading to URL-friendly anchor
+                    anchor_id = anchor.strip().lower().translate(_ANCHOR_TABLE)
+                    # Remove non-alphanumeric characters except hyphens and underscores
+                    anchor_id = _ANCHOR_STRIP_RE.sub('', anchor_id)
+                    relative_path += f'#{anchor_id}'
+                return f'<a href="{relative_path}" class="wiki-link">{alias}</a>'
+            else:
+                return f'<span class="wiki-link broken" title="Note not found: {link}">{alias}</span>'
+
+        lines = content.split('\n')
+        n = len(lines)
+        out_lines = []
+        inside_reference_section = False
+        i = 0
+        while i < n:
+            line = lines[i]
+            stripped = line.strip()
+
+            # [//begin]/[//end] sections exist for other parsers; drop them
+            if stripped.startswith('[//begin]'):
+                inside_reference_section = True
+                i += 1
+                continue
+            if stripped.startswith('[//end]'):
+                inside_reference_section = False
+                i += 1
+                continue
+            if inside_reference_section:
+                i += 1
+                continue
+
+            # Diagram fences are consumed whole so their code is emitted
+            # verbatim (no wiki-link substitution inside diagram source)
+            if stripped.startswith('```mermaid') or stripped.startswith('```plantuml'):
+                j = i + 1
+                while j < n and lines[j].strip() != '```':
+                    j += 1
+                if j < n:
+                    diagram_code = '\n'.join(lines[i + 1:j])
+                    if stripped.startswith('```mermaid'):
+                        out_lines.append(self.render_mermaid(diagram_code))
+                    else:
+                        out_lines.append(self.render_plantuml(diagram_code, current_note_id))
+                    i = j + 1
+                    continue
+                # Unterminated fence: fall through and treat as normal text
+
+            out_lines.append(_WIKI_LINK_RE.sub(replace_link, line))
+            i += 1
+
+        return '\n'.join(out_lines).strip(), list(set(links))
+    
+    def _get_up_prefix(self, from_note_id):
+        """Get the '../' prefix that climbs from a note's directory to the site root"""
+        note = self.notes.get(from_note_id)
+        if note is not None:
+            return note['_up_prefix']
+        # Fallback for ids without a loaded note (render workers only hold
+        # note ids, not full note dicts); memoized per directory depth
+        depth = from_note_id.count('/') + from_note_id.count('\\')
+        prefix = self._up_prefixes.get(depth)
+        if prefix is None:
+            prefix = self._up_prefixes[depth] = '../' * depth
+        return prefix
+
+    def get_relative_path(self, from_note_id, to_note_id):
+        """Calculate relative path from one note to another"""
+        return f"{self._get_up_prefix(from_note_id)}{to_note_id}.html"
+
+    def get_relative_diagram_path(self, from_note_id, img_filename):
+        """Calculate relative path from a note to a diagram image"""
+        return f"{self._get_up_prefix(from_note_id)}diagrams/{img_filename}"
+    
+    def render_mermaid(self, diagram_code):
+        """Render Mermaid diagrams (client-side)"""
+        return f'<div class="mermaid">\n{diagram_code}\n</div>'
+
+    def render_plantuml(self, diagram_code, note_id):
+        """Render PlantUML diagrams (pre-rendered at build time)"""
+        # Generate unique filename including theme version to force regeneration
+        theme_version = "dark_v5"  # Increment when theme changes
+        combined_content = f"{diagram_code}_{theme_version}"
+        diagram_hash = hashlib.blake2b(combined_content.encode(), digest_size=16).hexdigest()
+        img_filename = f'plantuml_{note_id}_{diagram_hash}.png'
+
+        if self._find_plantuml() is None:
+            # Fallback: render as code block with note to install PlantUML
+            return f'''<div class="plantuml-fallback">
 <p><em>PlantUML diagram (install PlantUML to see rendered image):</em></p>
 <pre><code class="language-plantuml">{diagram_code}</code></pre>
 </div>'''
-    
+
+        # The filename is deterministic, so the <img> tag can be emitted now
+        # and the rendering deferred: all queued diagrams are handed to one
+        # PlantUML invocation, paying the JVM start-up cost once instead of
+        # once per diagram. Every diagram is queued unconditionally;
+        # _render_pending_diagrams skips images already on disk, and the
+        # queue entries double as the cache record that lets later builds
+        # regenerate images deleted from the output.
+        self._pending_diagrams.append((diagram_code, img_filename))
+
+        relative_img_path = self.get_relative_diagram_path(note_id, img_filename)
+        return f'<img src="{relative_img_path}" alt="PlantUML diagram" class="plantuml-diagram">'
+
+    def _find_plantuml(self):
+        """Locate the PlantUML launcher once (None when not installed)"""
+        if not self._plantuml_checked:
+            self._plantuml_checked = True
+            if shutil.which('plantuml'):
+                self._plantuml = ['plantuml']
+            elif Path('plantuml.jar').exists() and shutil.which('java'):
+                self._plantuml = ['java', '-jar', 'plantuml.jar']
+        return self._plantuml
+
+    def _render_pending_diagrams(self):
+        """Render all queued PlantUML diagrams with a single invocation"""
+        if not self._pending_diagrams:
+            return
+
+        diagrams_dir = (self.output_dir / 'diagrams').absolute()
+        diagrams_dir.mkdir(parents=True, exist_ok=True)
+
+        # Images from previous builds are reused as-is; only missing
+        # targets go to PlantUML
+        pending = [(code, fname) for code, fname in self._pending_diagrams
+                   if not (diagrams_dir / fname).exists()]
+        self._pending_diagrams.clear()
+        if not pending:
+            return
+
+        with tempfile.TemporaryDirectory(suffix='-puml') as temp_dir:
+            temp_dir = Path(temp_dir)
+
+            # PlantUML names each PNG after its input file's stem, so write
+            # one .puml per target image (flattening note subdirectories)
+            jobs = {}
+            for diagram_code, img_filename in pending:
+                stem = img_filename.replace('/', '_')[:-4]
+                if stem not in jobs:
+                    (temp_dir / f'{stem}.puml').write_text(
+                        _PLANTUML_DARK_HEADER + diagram_code + '\n@enduml',
+                        encoding='utf-8'
+                    )
+                    jobs[stem] = []
+                jobs[stem].append(self.output_dir / 'diagrams' / img_filename)
+
+            try:
+                subprocess.run(
+                    self._find_plantuml() + ['-tpng', '-o', str(diagrams_dir)]
+                    + [str(temp_dir / f'{stem}.puml') for stem in jobs],
+                    capture_output=True,
+                    text=True
+                )
+            except Exception as e:
+                print(f"Warning: Could not render PlantUML diagrams: {e}")
+                return
+
+            # Move each generated image to its target filename
+            for stem, targets in jobs.items():
+                generated = diagrams_dir / f'{stem}.png'
+                if not generated.exists():
+                    print(f"Warning: PlantUML produced no image for {stem}")
+                    continue
+                for target in targets[1:]:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(generated, target)
+                target = targets[0]
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if target.absolute() != generated:
+                    generated.replace(target)
+
     def generate_html(self):
         """Generate HTML files for all notes"""
         # Create template
         template = self.create_template()
         
-        # Generate individual note pages
+        # Render individual note pages on a process pool: Jinja rendering
+        # is CPU-bound and releases no GIL. The graph/search/file-tree
+        # payloads live in shared JSON files that every page fetches, and
+        # the template reads only titles out of all_notes, so each payload
+        # carries just the fields its page needs.
+        titles = {note_id: {'title': note['title']}
+                  for note_id, note in self.notes.items()}
+
+        payloads = []
+        dirs = set()
         for note_id, note in self.notes.items():
-            output_path = self.output_dir / f"{note_id}.html"
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Get graph data with relative URLs for this specific page
-            graph_data = self.get_graph_data_for_page(note_id)
-            
-            # Generate relative URLs for all notes from this page
-            link_urls = {}
-            for other_note_id in self.notes:
-                link_urls[other_note_id] = self.get_relative_path(note_id, other_note_id)
-            
-            # Render template with graph data specific to current page
-            html = template.render(
-                note=note,
-                all_notes=self.notes,
-                graph_data=json.dumps(graph_data),
-                current_note_id=note_id,
-                search_data=json.dumps(self.get_search_data_for_page(note_id)),
-                file_tree_data=json.dumps(self.get_file_tree_data(note_id)),
-                link_urls=link_urls,
-                is_index=False
-            )
-            
-            output_path.write_text(html)
-        
+            payloads.append((note_id, {
+                'title': note['title'],
+                'html': note['html'],
+                'links': note['links'],
+                'backlinks': note['backlinks']
+            }, note['_up_prefix']))
+            dirs.add((self.output_dir / f"{note_id}.html").parent)
+
+        # One mkdir per unique directory before the workers fan out
+        for parent in dirs:
+            parent.mkdir(parents=True, exist_ok=True)
+
+        with ProcessPoolExecutor(
+            initializer=_init_page_worker,
+            initargs=(type(self), self.output_dir, titles)
+        ) as executor:
+            list(executor.map(_render_page, payloads, chunksize=16))
+
         # Generate index page
         self.generate_index_page(template)
-    
-    def get_graph_data_for_page(self, current_note_id):
-        """Get graph data with relative URLs for a specific page"""
-        nodes = []
-        edges = []
-        
-        # Add all nodes with relative URLs from current page
-        for note_id, note in self.notes.items():
-            relative_url = self.get_relative_path(current_note_id, note_id)
-            nodes.append({
-                'id': note_id,
-                'label': note['title'],
-                'url': relative_url
-            })
-        
-        # Add all edges
-        edge_set = set()  # To avoid duplicates
-        for note_id, note in self.notes.items():
-            for link in note['links']:
-                if link in self.notes:
-                    edge_key = (note_id, link)
-                    if edge_key not in edge_set:
-                        edge_set.add(edge_key)
-                        edges.append({'source': note_id, 'target': link})
-        
-        return {'nodes': nodes, 'edges': edges}
-    
+
+    def generate_data_files(self):
+        """Write the shared graph and file-tree payloads fetched by every page"""
+        graph_path = self.output_dir / 'graph.json'
+        graph_path.write_bytes(_json_dumps(self.get_full_graph_data()))
+
+        tree_path = self.output_dir / 'file-tree.json'
+        tree_path.write_bytes(_json_dumps(self.get_file_tree_data()))
+
     def get_full_graph_data(self):
-        """Get complete graph data with all nodes (for index page)"""
-        nodes = []
-        edges = []
-        
-        # Add all nodes (for index page, use direct URLs)
-        for note_id, note in self.notes.items():
-            nodes.append({
-                'id': note_id,
-                'label': note['title'],
-                'url': note['url']
-            })
-        
-        # Add all edges
-        edge_set = set()  # To avoid duplicates
+        """Get complete graph data, columnar for compact JSON"""
+        # Structure-of-arrays with short keys: large-vault payloads are
+        # dominated by the per-record key strings of row-wise JSON, so
+        # columns cut the wire size substantially. Pages rebuild the row
+        # objects D3 wants right after the fetch.
+        ids, labels, urls = [], [], []
+        xs, ys = [], []
+
+        # Seed positions from a build-time spring layout so the browser can
+        # settle the graph with a few warmup ticks instead of running the
+        # full O(N^2) force simulation live. Coordinates land in [-1, 1]
+        # and are scaled to the viewport client-side. spring_layout needs
+        # numpy, which is optional here, so fall back to unseeded nodes.
+        try:
+            positions = nx.spring_layout(self.graph, iterations=50, seed=42)
+        except ImportError:
+            positions = {}
+
         for note_id, note in self.notes.items():
-            for link in note['links']:
-                if link in self.notes:
-                    edge_key = (note_id, link)
-                    if edge_key not in edge_set:
-                        edge_set.add(edge_key)
-                        edges.append({'source': note_id, 'target': link})
-        
-        return {'nodes': nodes, 'edges': edges}
+            ids.append(note_id)
+            labels.append(note['title'])
+            urls.append(note['url'])
+            pos = positions.get(note_id)
+            if pos is not None:
+                xs.append(round(float(pos[0]), 4))
+                ys.append(round(float(pos[1]), 4))
+
+        nodes = {'i': ids, 'l': labels, 'u': urls}
+        if xs and len(xs) == len(ids):
+            nodes['x'] = xs
+            nodes['y'] = ys
+
+        # Edges were deduplicated once while building the graph
+        return {
+            'nodes': nodes,
+            'edges': {
+                's': [source for source, _ in self._edges],
+                't': [target for _, target in self._edges]
+            }
+        }
     
     def get_search_data(self):
-        """Prepare search index data"""
-        search_data = []
+        """Prepare search index data (columnar, parallel arrays)"""
+        ids, titles, titles_lc = [], [], []
+        previews, previews_lc, urls = [], [], []
         for note_id, note in self.notes.items():
-            search_data.append({
-                'id': note_id,
-                'title': note['title'],
-                'content': note['content'][:500],  # First 500 chars for preview
-                'url': note['url']
-            })
-        return search_data
-    
-    def get_search_data_for_page(self, current_note_id):
-        """Prepare search index data with relative URLs for a specific page"""
-        search_data = []
-        for note_id, note in self.notes.items():
-            relative_url = self.get_relative_path(current_note_id, note_id)
-            search_data.append({
-                'id': note_id,
-                'title': note['title'],
-                'content': note['content'][:500],  # First 500 chars for preview
-                'url': relative_url
-            })
-        return search_data
+            ids.append(note_id)
+            titles.append(note['title'])
+            # Lowercased copies let the browser match without calling
+            # toLowerCase() on every note for every keystroke
+            titles_lc.append(note['title'].lower())
+            previews.append(note['_preview'])  # Computed in process_notes
+            previews_lc.append(note['_preview'].lower())
+            urls.append(note['url'])
+
+        # Inverted trigram index over exactly the text the client verifies
+        # against (lowercased title + preview). Queries intersect posting
+        # lists and only substring-check the handful of candidates, so
+        # search cost stops growing with vault size. Posting lists hold
+        # array indices and come out ascending for free.
+        trigrams = defaultdict(list)
+        for idx, title_lc in enumerate(titles_lc):
+            text = f'{title_lc} {previews_lc[idx]}'
+            seen = set()
+            for i in range(len(text) - 2):
+                tri = text[i:i + 3]
+                if tri not in seen:
+                    seen.add(tri)
+                    trigrams[tri].append(idx)
+
+        return {
+            'i': ids,
+            't': titles,
+            'tl': titles_lc,
+            'p': previews,
+            'pl': previews_lc,
+            'u': urls,
+            'g': trigrams
+        }
     
-    def generate_file_tree(self, current_note_id=None):
-        """Generate hierarchical file tree structure"""
+    def generate_file_tree(self):
+        """Generate hierarchical file tree structure (built once and cached)"""
+        # The tree holds root-relative URLs, so it is page-independent:
+        # pages prepend their own basePrefix client-side
+        if self._tree_structure is not None:
+            return self._tree_structure
+
         tree = {}
-        
-        # Build tree structure from file paths
-        for note_id, note in self.notes.items():
-            path_parts = Path(note['path']).parts
-            current_level = tree
-            
-            # Navigate/create the tree structure
-            for i, part in enumerate(path_parts):
-                if i == len(path_parts) - 1:
-                    # This is the file
-                    if part not in current_level:
-                        current_level[part] = {
-                            'type': 'file',
-                            'note_id': note_id,
-                            'title': note['title'],
-                            'url': self.get_relative_path(current_note_id, note_id) if current_note_id else note['url']
-                        }
-                else:
-                    # This is a directory
-                    if part not in current_level:
-                        current_level[part] = {
-                            'type': 'directory',
-                            'children': {}
-                        }
-                    current_level = current_level[part]['children']
-        
+
+        # Sorting by path makes the build a single monotonic walk: each
+        # directory dict is created exactly once and kept on a stack, so
+        # consecutive notes in the same folder skip re-resolving it
+        entries = sorted(
+            (Path(note['path']).parts, note_id)
+            for note_id, note in self.notes.items()
+        )
+
+        stack = []  # (dir_name, children_dict) for the open directories
+        for parts, note_id in entries:
+            dirs = parts[:-1]
+
+            # Keep the stack prefix shared with this path, drop the rest
+            common = 0
+            while (common < len(stack) and common < len(dirs)
+                   and stack[common][0] == dirs[common]):
+                common += 1
+            del stack[common:]
+
+            # Create any remaining directories along the path
+            level = stack[-1][1] if stack else tree
+            for part in dirs[common:]:
+                children = {}
+                level[part] = {'type': 'directory', 'children': children}
+                level = children
+                stack.append((part, children))
+
+            note = self.notes[note_id]
+            level[parts[-1]] = {
+                'type': 'file',
+                'note_id': note_id,
+                'title': note['title'],
+                'url': note['url']
+            }
+
+        self._tree_structure = tree
         return tree
-    
-    def get_file_tree_data(self, current_note_id=None):
+
+    def get_file_tree_data(self):
         """Get file tree data for template rendering"""
-        return self.generate_file_tree(current_note_id)
+        return self.generate_file_tree()
     
     def generate_search_index(self):
         """Generate search index file"""
-        search_index = {
-            'notes': self.get_search_data()
-        }
-        
         index_path = self.output_dir / 'search-index.json'
-        index_path.write_text(json.dumps(search_index))
+        index_path.write_bytes(_json_dumps(self.get_search_data()))
     
     def generate_index_page(self, template):
         """Generate main index page"""
-        # Get full graph data
-        graph_data = self.get_full_graph_data()
-        
-        html = template.render(
+        # Stream straight to disk as UTF-8 instead of materializing the
+        # whole page as a str and re-encoding it on write
+        stream = template.stream(
             is_index=True,
             notes=self.notes,
-            graph_data=json.dumps(graph_data),
             current_note_id=None,
-            search_data=json.dumps(self.get_search_data()),
-            file_tree_data=json.dumps(self.get_file_tree_data())
+            base_prefix=''
         )
-        
-        (self.output_dir / 'index.html').write_text(html)
+        stream.dump(str(self.output_dir / 'index.html'), encoding='utf-8')
     
+    # Compiled page template, shared across instances: the template source
+    # is a string literal, so it only needs to be parsed once per process.
+    # Cached per concrete class, so a subclass that overrides this method
+    # with its own template string compiles its own copy.
+    _compiled_template = None
+
     def create_template(self):
         """Create HTML template"""
+        cached = type(self).__dict__.get('_compiled_template')
+        if cached is not None:
+            return cached
         template_str = '''<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -910,7 +1105,7 @@ skinparam stereotypeEBackgroundColor #2d2d30
                             {% for link in note.links %}
                                 {% if link in all_notes %}
                                 <li class="link-item">
-                                    <a href="{{ link_urls[link] }}">{{ all_notes[link].title }}</a>
+                                    <a href="{{ base_prefix }}{{ link }}.html">{{ all_notes[link].title }}</a>
                                 </li>
                                 {% endif %}
                             {% endfor %}
@@ -923,7 +1118,7 @@ skinparam stereotypeEBackgroundColor #2d2d30
                             {% for backlink in note.backlinks %}
                                 {% if backlink in all_notes %}
                                 <li class="link-item">
-                                    <a href="{{ link_urls[backlink] }}">{{ all_notes[backlink].title }}</a>
+                                    <a href="{{ base_prefix }}{{ backlink }}.html">{{ all_notes[backlink].title }}</a>
                                 </li>
                                 {% endif %}
                             {% endfor %}
@@ -970,12 +1165,61 @@ skinparam stereotypeEBackgroundColor #2d2d30
             
             document.getElementById(tabName + '-tab').style.display = 'block';
             event.target.classList.add('active');
+
+            if (tabName === 'graph') {
+                ensureGraph();
+                // Nudge a partially-settled layout; seeded layouts are
+                // already pinned and need no restart
+                if (graphInitialized && simulation && !layoutSeeded) {
+                    simulation.alpha(0.1).restart();
+                }
+            } else if (simulation) {
+                // Don't burn CPU laying out a graph nobody can see
+                simulation.stop();
+            }
+
+            if (tabName === 'files') {
+                ensureFileTree();
+            }
         }
         
-        // Graph visualization
-        const graphData = {{ graph_data|safe }};
+        // Prefix for navigating from this page back to the site root
+        const basePrefix = "{{ base_prefix }}";
         const currentNoteId = {% if is_index %}null{% else %}"{{ current_note_id }}"{% endif %};
-        
+
+        // The graph, search, and file-tree payloads are shared by every page,
+        // so they are fetched from build-time JSON files instead of being
+        // embedded (and re-serialized) into each page
+        let graphData = null;
+        let searchData = null;
+        let fileTreeData = null;
+        const dataReady = Promise.all([
+            fetch(basePrefix + 'graph.json').then(r => r.json()),
+            fetch(basePrefix + 'search-index.json').then(r => r.json()),
+            fetch(basePrefix + 'file-tree.json').then(r => r.json())
+        ]).then(([graph, searchIndex, tree]) => {
+            // The wire format is columnar (parallel arrays, short keys) to
+            // keep payloads small; expand the graph back into the row
+            // objects D3 mutates in place. The search index stays columnar
+            // and is scanned by index.
+            const cols = graph.nodes;
+            graphData = {
+                nodes: cols.i.map((id, k) => {
+                    const node = { id: id, label: cols.l[k], url: cols.u[k] };
+                    if (cols.x) {
+                        node.x = cols.x[k];
+                        node.y = cols.y[k];
+                    }
+                    return node;
+                }),
+                edges: graph.edges.s.map((s, k) => (
+                    { source: s, target: graph.edges.t[k] }
+                ))
+            };
+            searchData = searchIndex;
+            fileTreeData = tree;
+        });
+
         // Get dynamic dimensions
         function getGraphDimensions() {
             const graphContainer = document.getElementById('graph');
@@ -986,104 +1230,322 @@ skinparam stereotypeEBackgroundColor #2d2d30
             };
         }
         
-        let { width, height } = getGraphDimensions();
-        
-        const svg = d3.select("#graph")
-            .append("svg")
-            .attr("width", width)
-            .attr("height", height);
-        
-        // Add zoom behavior
-        const g = svg.append("g");
-        const zoom = d3.zoom()
-            .scaleExtent([0.1, 4])
-            .on("zoom", (event) => {
-                g.attr("transform", event.transform);
-            });
-        svg.call(zoom);
-        
-        const simulation = d3.forceSimulation(graphData.nodes)
-            .force("link", d3.forceLink(graphData.edges).id(d => d.id).distance(50))
-            .force("charge", d3.forceManyBody().strength(-150))
-            .force("center", d3.forceCenter(width / 2, height / 2))
-            .force("collision", d3.forceCollide().radius(25))
-            .force("x", d3.forceX(width / 2).strength(0.02))
-            .force("y", d3.forceY(height / 2).strength(0.02));
-        
-        const link = g.append("g")
-            .selectAll("line")
-            .data(graphData.edges)
-            .enter().append("line")
-            .attr("class", "graph-link")
-            .attr("stroke-width", 1);
-        
-        const node = g.append("g")
-            .selectAll("circle")
-            .data(graphData.nodes)
-            .enter().append("circle")
-            .attr("r", d => d.id === currentNoteId ? 8 : 5)
-            .attr("fill", d => {
-                if (d.id === currentNoteId) return "#007acc";
-                // Color connected nodes differently
-                const isConnected = graphData.edges.some(e => 
-                    (e.source.id || e.source) === currentNoteId && (e.target.id || e.target) === d.id ||
-                    (e.target.id || e.target) === currentNoteId && (e.source.id || e.source) === d.id
-                );
-                return isConnected ? "#4CAF50" : "#cccccc";
-            })
-            .attr("class", "graph-node")
-            .attr("stroke", "#fff")
-            .attr("stroke-width", 1.5)
-            .on("click", (event, d) => {
-                window.location.href = d.url;
-            })
-            .on("mouseover", function(event, d) {
-                // Show tooltip
-                const tooltip = d3.select("body").append("div")
-                    .attr("class", "graph-tooltip")
-                    .style("position", "absolute")
-                    .style("background", "#333")
-                    .style("color", "#fff")
-                    .style("padding", "5px 10px")
-                    .style("border-radius", "3px")
-                    .style("font-size", "12px")
-                    .style("pointer-events", "none")
-                    .text(d.label);
-                
-                tooltip.style("left", (event.pageX + 10) + "px")
-                    .style("top", (event.pageY - 10) + "px");
-            })
-            .on("mouseout", function() {
-                d3.selectAll(".graph-tooltip").remove();
-            })
-            .call(d3.drag()
-                .on("start", dragstarted)
-                .on("drag", dragged)
-                .on("end", dragended));
-        
-        simulation.on("tick", () => {
-            link
-                .attr("x1", d => d.source.x)
-                .attr("y1", d => d.source.y)
-                .attr("x2", d => d.target.x)
-                .attr("y2", d => d.target.y);
-            
-            node
-                .attr("cx", d => d.x)
-                .attr("cy", d => d.y);
+        // Graph state is assigned when the graph is built, after the shared
+        // payloads have loaded
+        let width, height, svg, g, zoom, simulation;
+
+        // Above this many nodes, per-element SVG DOM costs (style recalc,
+        // hit testing) dominate; render the graph on a single canvas instead
+        const CANVAS_NODE_THRESHOLD = 1000;
+
+        // Whether node positions were seeded (build-time layout or a
+        // session-cached one); seeded graphs skip the live simulation
+        let layoutSeeded = false;
+
+        function seedPositions() {
+            let savedMap = null;
+            try {
+                const saved = JSON.parse(sessionStorage.getItem('graph-layout'));
+                if (Array.isArray(saved)) {
+                    savedMap = new Map();
+                    for (const [id, x, y] of saved) savedMap.set(id, [x, y]);
+                }
+            } catch (e) { /* corrupt or absent cache; fall through */ }
+
+            let seeded = false;
+            for (const n of graphData.nodes) {
+                const prev = savedMap && savedMap.get(n.id);
+                if (prev) {
+                    [n.x, n.y] = prev;
+                    seeded = true;
+                } else if (n.x !== undefined) {
+                    // Build-time spring layout in [-1, 1]; map to viewport
+                    n.x = width / 2 + n.x * (width / 2 - 20);
+                    n.y = height / 2 + n.y * (height / 2 - 20);
+                    seeded = true;
+                }
+            }
+            return seeded;
+        }
+
+        // Keep the settled layout for instant restore on reload
+        window.addEventListener('pagehide', () => {
+            if (!simulation) return;
+            sessionStorage.setItem('graph-layout', JSON.stringify(
+                graphData.nodes.map(n => [n.id, Math.round(n.x), Math.round(n.y)])
+            ));
         });
-        
-        // Zoom controls
-        d3.select("#graph").append("div")
-            .attr("class", "graph-controls")
-            .style("position", "absolute")
-            .style("bottom", "10px")
-            .style("right", "10px")
-            .html(`
-                <button onclick="zoomIn()">+</button>
-                <button onclick="zoomOut()">-</button>
-                <button onclick="resetZoom()">Reset</button>
-            `);
+
+        function initGraph() {
+            ({ width, height } = getGraphDimensions());
+            layoutSeeded = seedPositions();
+
+            if (graphData.nodes.length > CANVAS_NODE_THRESHOLD) {
+                initCanvasGraph();
+            } else {
+                initSvgGraph();
+            }
+
+            // Zoom controls (shared by both renderers)
+            d3.select("#graph").append("div")
+                .attr("class", "graph-controls")
+                .style("position", "absolute")
+                .style("bottom", "10px")
+                .style("right", "10px")
+                .html(`
+                    <button onclick="zoomIn()">+</button>
+                    <button onclick="zoomOut()">-</button>
+                    <button onclick="resetZoom()">Reset</button>
+                `);
+        }
+
+        // Ids adjacent to the current note, computed once so node coloring
+        // is an O(1) lookup instead of an O(edges) scan per node
+        function buildConnectedSet() {
+            const connected = new Set();
+            for (const e of graphData.edges) {
+                const s = e.source.id || e.source;
+                const t = e.target.id || e.target;
+                if (s === currentNoteId) connected.add(t);
+                else if (t === currentNoteId) connected.add(s);
+            }
+            return connected;
+        }
+
+        function initSvgGraph() {
+            svg = d3.select("#graph")
+                .append("svg")
+                .attr("width", width)
+                .attr("height", height);
+
+            // Add zoom behavior
+            g = svg.append("g");
+            zoom = d3.zoom()
+                .scaleExtent([0.1, 4])
+                .on("zoom", (event) => {
+                    g.attr("transform", event.transform);
+                });
+            svg.call(zoom);
+
+            simulation = d3.forceSimulation(graphData.nodes)
+                .force("link", d3.forceLink(graphData.edges).id(d => d.id).distance(50))
+                // Coarser Barnes-Hut approximation plus a bounded
+                // interaction range keeps per-tick charge cost local
+                .force("charge", d3.forceManyBody().strength(-150).theta(1.5).distanceMax(200))
+                .force("center", d3.forceCenter(width / 2, height / 2))
+                .force("collision", d3.forceCollide().radius(25))
+                .force("x", d3.forceX(width / 2).strength(0.02))
+                .force("y", d3.forceY(height / 2).strength(0.02));
+        
+            const link = g.append("g")
+                .selectAll("line")
+                .data(graphData.edges)
+                .enter().append("line")
+                .attr("class", "graph-link")
+                .attr("stroke-width", 1);
+        
+            const connected = buildConnectedSet();
+
+            const node = g.append("g")
+                .selectAll("circle")
+                .data(graphData.nodes)
+                .enter().append("circle")
+                .attr("r", d => d.id === currentNoteId ? 8 : 5)
+                .attr("fill", d => {
+                    if (d.id === currentNoteId) return "#007acc";
+                    return connected.has(d.id) ? "#4CAF50" : "#cccccc";
+                })
+                .attr("class", "graph-node")
+                .attr("stroke", "#fff")
+                .attr("stroke-width", 1.5)
+                .on("click", (event, d) => {
+                    window.location.href = basePrefix + d.url;
+                })
+                .on("mouseover", function(event, d) {
+                    // Show tooltip
+                    const tooltip = d3.select("body").append("div")
+                        .attr("class", "graph-tooltip")
+                        .style("position", "absolute")
+                        .style("background", "#333")
+                        .style("color", "#fff")
+                        .style("padding", "5px 10px")
+                        .style("border-radius", "3px")
+                        .style("font-size", "12px")
+                        .style("pointer-events", "none")
+                        .text(d.label);
+                
+                    tooltip.style("left", (event.pageX + 10) + "px")
+                        .style("top", (event.pageY - 10) + "px");
+                })
+                .on("mouseout", function() {
+                    d3.selectAll(".graph-tooltip").remove();
+                })
+                .call(d3.drag()
+                    .on("start", dragstarted)
+                    .on("drag", dragged)
+                    .on("end", dragended));
+        
+            // Coalesce simulation ticks into one DOM flush per animation
+            // frame: ticks arriving faster than the display refresh would
+            // otherwise write positions the browser never paints
+            let pendingFrame = null;
+
+            function flushPositions() {
+                pendingFrame = null;
+                link
+                    .attr("x1", d => d.source.x)
+                    .attr("y1", d => d.source.y)
+                    .attr("x2", d => d.target.x)
+                    .attr("y2", d => d.target.y);
+
+                node
+                    .attr("cx", d => d.x)
+                    .attr("cy", d => d.y);
+            }
+
+            simulation.on("tick", () => {
+                if (!pendingFrame) {
+                    pendingFrame = requestAnimationFrame(flushPositions);
+                }
+            });
+
+            simulation.on("end", () => {
+                if (pendingFrame) {
+                    cancelAnimationFrame(pendingFrame);
+                }
+                // Pin the final layout with one last synchronous flush
+                flushPositions();
+            });
+
+            if (layoutSeeded) {
+                // Positions are already close; a few silent warmup ticks
+                // settle them without a live animated layout
+                simulation.tick(30);
+                simulation.stop();
+                flushPositions();
+            }
+        }
+
+        function initCanvasGraph() {
+            svg = d3.select("#graph")
+                .append("canvas")
+                .attr("width", width)
+                .attr("height", height);
+            const canvas = svg.node();
+            const ctx = canvas.getContext("2d");
+            let transform = d3.zoomIdentity;
+
+            simulation = d3.forceSimulation(graphData.nodes)
+                .force("link", d3.forceLink(graphData.edges).id(d => d.id).distance(50))
+                // Coarser Barnes-Hut approximation plus a bounded
+                // interaction range keeps per-tick charge cost local
+                .force("charge", d3.forceManyBody().strength(-150).theta(1.5).distanceMax(200))
+                .force("center", d3.forceCenter(width / 2, height / 2))
+                .force("collision", d3.forceCollide().radius(25))
+                .force("x", d3.forceX(width / 2).strength(0.02))
+                .force("y", d3.forceY(height / 2).strength(0.02));
+
+            const connected = buildConnectedSet();
+
+            function drawNodeBatch(fill, radius, wanted) {
+                ctx.beginPath();
+                for (const d of graphData.nodes) {
+                    if (!wanted(d)) continue;
+                    ctx.moveTo(d.x + radius, d.y);
+                    ctx.arc(d.x, d.y, radius, 0, 2 * Math.PI);
+                }
+                ctx.fillStyle = fill;
+                ctx.fill();
+                ctx.strokeStyle = "#fff";
+                ctx.lineWidth = 1.5;
+                ctx.stroke();
+            }
+
+            function draw() {
+                ctx.clearRect(0, 0, width, height);
+                ctx.save();
+                ctx.translate(transform.x, transform.y);
+                ctx.scale(transform.k, transform.k);
+
+                // All links stroked as a single path
+                ctx.beginPath();
+                for (const e of graphData.edges) {
+                    ctx.moveTo(e.source.x, e.source.y);
+                    ctx.lineTo(e.target.x, e.target.y);
+                }
+                ctx.strokeStyle = "#999";
+                ctx.lineWidth = 1;
+                ctx.globalAlpha = 0.6;
+                ctx.stroke();
+                ctx.globalAlpha = 1;
+
+                // Nodes batched into one fill call per color
+                drawNodeBatch("#cccccc", 5,
+                    d => d.id !== currentNoteId && !connected.has(d.id));
+                drawNodeBatch("#4CAF50", 5,
+                    d => d.id !== currentNoteId && connected.has(d.id));
+                drawNodeBatch("#007acc", 8, d => d.id === currentNoteId);
+
+                ctx.restore();
+            }
+
+            let pendingDraw = null;
+            function scheduleDraw() {
+                if (!pendingDraw) {
+                    pendingDraw = requestAnimationFrame(() => {
+                        pendingDraw = null;
+                        draw();
+                    });
+                }
+            }
+
+            simulation.on("tick", scheduleDraw);
+            simulation.on("end", draw);
+
+            zoom = d3.zoom()
+                .scaleExtent([0.1, 4])
+                .on("zoom", (event) => {
+                    transform = event.transform;
+                    scheduleDraw();
+                });
+            svg.call(zoom);
+
+            // One quadtree hit test per click instead of N element listeners
+            svg.on("click", (event) => {
+                const [px, py] = transform.invert(d3.pointer(event, canvas));
+                const hit = d3.quadtree(graphData.nodes, d => d.x, d => d.y)
+                    .find(px, py, 10);
+                if (hit) window.location.href = basePrefix + hit.url;
+            });
+
+            if (layoutSeeded) {
+                // Positions are already close; a few silent warmup ticks
+                // settle them without a live animated layout
+                simulation.tick(30);
+                simulation.stop();
+                draw();
+            }
+        }
+
+        // Build the graph lazily, and only once. Graph is the default tab,
+        // so desktop pages initialize as soon as the payloads arrive; on
+        // mobile the sidebar starts closed, so construction waits for the
+        // first time the graph can actually be seen.
+        let graphInitialized = false;
+
+        function ensureGraph() {
+            if (graphInitialized) return;
+            dataReady.then(() => {
+                if (!graphInitialized) {
+                    graphInitialized = true;
+                    initGraph();
+                }
+            });
+        }
+
+        if (window.innerWidth > 768) {
+            ensureGraph();
+        }
         
         function zoomIn() {
             svg.transition().call(zoom.scaleBy, 1.3);
@@ -1116,6 +1578,7 @@ skinparam stereotypeEBackgroundColor #2d2d30
         
         // Graph resize function
         function resizeGraph() {
+            if (!svg) return;  // Graph not built yet
             const newDimensions = getGraphDimensions();
             width = newDimensions.width;
             height = newDimensions.height;
@@ -1129,37 +1592,103 @@ skinparam stereotypeEBackgroundColor #2d2d30
             // Restart simulation with new dimensions
             simulation.alpha(0.3).restart();
         }
+
+        // Coalesce resize work to one layout read + restart per animation
+        // frame, no matter how fast the triggering events arrive
+        let resizeRaf = null;
+
+        function scheduleGraphResize() {
+            if (!resizeRaf) {
+                resizeRaf = requestAnimationFrame(() => {
+                    resizeRaf = null;
+                    resizeGraph();
+                });
+            }
+        }
         
-        // Search functionality
-        const searchData = {{ search_data|safe }};
+        // Search functionality (searchData is populated by the shared fetch)
         const searchInput = document.getElementById('search-input');
         const searchResults = document.getElementById('search-results');
-        
+
+        function debounce(fn, ms) {
+            let timer = null;
+            return (...args) => {
+                clearTimeout(timer);
+                timer = setTimeout(() => fn(...args), ms);
+            };
+        }
+
+        // Intersect build-time trigram posting lists to get candidate note
+        // indices. Returns null when the query is too short to have a
+        // trigram (caller falls back to a full scan) and [] when any
+        // trigram is absent from the vault.
+        function candidateIndices(query) {
+            const postings = searchData.g;
+            if (!postings || query.length < 3) return null;
+
+            let candidates = null;
+            for (let i = 0; i + 3 <= query.length; i++) {
+                const list = postings[query.slice(i, i + 3)];
+                if (!list) return [];
+                if (candidates === null) {
+                    candidates = list;
+                } else {
+                    const keep = new Set(list);
+                    candidates = candidates.filter(idx => keep.has(idx));
+                }
+                if (candidates.length === 0) return [];
+            }
+            return candidates;
+        }
+
+        function runSearch(query) {
+            if (!searchData) return;
+
+            // Verify only the trigram candidates (tl/pl are lowercased at
+            // build time); the loop stops at the display limit
+            const hits = [];
+            const { tl, pl } = searchData;
+            const candidates = candidateIndices(query);
+            const count = candidates === null ? tl.length : candidates.length;
+            for (let k = 0; k < count && hits.length < 10; k++) {
+                const i = candidates === null ? k : candidates[k];
+                // indexOf on the short title first, so title hits skip
+                // the longer preview scan entirely
+                if (tl[i].indexOf(query) !== -1 || pl[i].indexOf(query) !== -1) {
+                    hits.push(i);
+                }
+            }
+
+            searchResults.innerHTML = hits.map(i => `
+                <li class="search-result" onclick="window.location.href='${basePrefix + searchData.u[i]}'">
+                    <strong>${searchData.t[i]}</strong><br>
+                    <small>${searchData.p[i]}...</small>
+                </li>
+            `).join('');
+        }
+
+        // Scanning searchData on every keystroke wastes work that the next
+        // keystroke discards; debounce so only a pause in typing pays for
+        // the filter. The query is captured before the delay so the
+        // debounced call always sees the value that scheduled it.
+        const debouncedSearch = debounce(runSearch, 250);
+
         searchInput?.addEventListener('input', (e) => {
             const query = e.target.value.toLowerCase();
             if (query.length < 2) {
                 searchResults.innerHTML = '';
                 return;
             }
-            
-            const results = searchData.filter(note => 
-                note.title.toLowerCase().includes(query) || 
-                note.content.toLowerCase().includes(query)
-            );
-            
-            searchResults.innerHTML = results.slice(0, 10).map(note => `
-                <li class="search-result" onclick="window.location.href='${note.url}'">
-                    <strong>${note.title}</strong><br>
-                    <small>${note.content.substring(0, 100)}...</small>
-                </li>
-            `).join('');
+            debouncedSearch(query);
         });
         
-        // File tree functionality
-        const fileTreeData = {{ file_tree_data|safe }};
+        // File tree functionality (fileTreeData is populated by the shared fetch)
         const fileTreeContainer = document.getElementById('file-tree');
         
         function renderFileTree(tree, container, level = 0) {
+            // Accumulate into a fragment so the live DOM takes a single
+            // insertion per level instead of one reflow entry per file
+            const frag = document.createDocumentFragment();
             for (const [name, item] of Object.entries(tree)) {
                 const element = document.createElement('div');
                 element.className = 'file-tree-item';
@@ -1173,44 +1702,69 @@ skinparam stereotypeEBackgroundColor #2d2d30
                     
                     const childrenContainer = document.createElement('div');
                     childrenContainer.className = 'file-tree-children';
-                    
-                    // Add click handler for folder toggle
-                    element.addEventListener('click', (e) => {
-                        e.stopPropagation();
-                        element.classList.toggle('expanded');
-                        childrenContainer.classList.toggle('expanded');
-                    });
-                    
-                    // Render children
+
+                    // Children render lazily on first expand, so collapsed
+                    // subtrees never cost DOM nodes
                     if (item.children && Object.keys(item.children).length > 0) {
-                        renderFileTree(item.children, childrenContainer, level + 1);
+                        childrenContainer._lazyChildren = item.children;
                     }
-                    
-                    container.appendChild(element);
-                    container.appendChild(childrenContainer);
+
+                    frag.appendChild(element);
+                    frag.appendChild(childrenContainer);
                 } else if (item.type === 'file') {
                     element.innerHTML = `
-                        <a href="${item.url}" class="file-tree-file" title="${item.title}">
+                        <a href="${basePrefix + item.url}" class="file-tree-file" title="${item.title}">
                             📄 ${item.title}
                         </a>
                     `;
-                    container.appendChild(element);
+                    frag.appendChild(element);
                 }
             }
+            container.appendChild(frag);
         }
         
-        // Initialize file tree
-        if (fileTreeContainer && fileTreeData) {
-            renderFileTree(fileTreeData, fileTreeContainer);
+        // One delegated listener covers every folder toggle, instead of a
+        // retained closure per folder; clicks resolve to the innermost
+        // folder row, whose next sibling holds its children
+        fileTreeContainer?.addEventListener('click', (e) => {
+            const folder = e.target.closest('.file-tree-folder');
+            if (!folder) return;
+            const children = folder.nextElementSibling;
+            if (!children) return;
+            if (children._lazyChildren) {
+                renderFileTree(children._lazyChildren, children);
+                children._lazyChildren = null;
+            }
+            folder.classList.toggle('expanded');
+            children.classList.toggle('expanded');
+        });
+
+        // The tree renders lazily on first activation of the Files tab, so
+        // pages where it is never opened pay no DOM cost for it
+        let fileTreeRendered = false;
+
+        function ensureFileTree() {
+            if (fileTreeRendered) return;
+            dataReady.then(() => {
+                if (!fileTreeRendered && fileTreeContainer && fileTreeData) {
+                    fileTreeRendered = true;
+                    renderFileTree(fileTreeData, fileTreeContainer);
+                }
+            });
         }
         
         // Mobile sidebar toggle functionality
         function toggleSidebar() {
             const sidebar = document.getElementById('sidebar');
             const overlay = document.querySelector('.sidebar-overlay');
-            
+
             sidebar.classList.toggle('open');
             overlay.classList.toggle('active');
+
+            // First open on mobile: the graph pane just became visible
+            if (sidebar.classList.contains('open')) {
+                ensureGraph();
+            }
         }
         
         function closeSidebar() {
@@ -1271,8 +1825,8 @@ skinparam stereotypeEBackgroundColor #2d2d30
             // Enforce min/max width constraints
             if (newWidth >= 200 && newWidth <= 600) {
                 sidebar.style.width = newWidth + 'px';
-                // Resize graph immediately since transition is disabled
-                resizeGraph();
+                // At most one graph resize per frame during the drag
+                scheduleGraphResize();
             }
         }
         
@@ -1291,22 +1845,55 @@ skinparam stereotypeEBackgroundColor #2d2d30
         
         // Keyboard shortcuts removed for desktop collapse
         
-        // Handle window resize
-        window.addEventListener('resize', () => {
-            requestAnimationFrame(resizeGraph);
-        });
+        // Handle window resize: wait for the flurry of intermediate events
+        // to settle, then resize once on the trailing edge
+        window.addEventListener('resize', debounce(scheduleGraphResize, 100));
     </script>
 </body>
 </html>'''
         
-        env = Environment(loader=FileSystemLoader('.'))
-        return env.from_string(template_str)
+        env = Environment(
+            loader=FileSystemLoader('.'),
+            auto_reload=False,
+            cache_size=400
+        )
+        compiled = env.from_string(template_str)
+        type(self)._compiled_template = compiled
+        return compiled
     
     def copy_assets(self):
         """Copy any additional assets"""
         # This is where you'd copy CSS, JS, images, etc.
         pass
 
+    def _load_build_cache(self):
+        """Load the build cache persisted by the previous run"""
+        cache_path = self.output_dir / '.cache.json'
+        try:
+            cache = json.loads(cache_path.read_text(encoding='utf-8'))
+            if cache.get('version') == _CACHE_VERSION:
+                return cache
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save_build_cache(self):
+        """Persist rendered HTML and links so unchanged notes skip rendering"""
+        cache = {
+            'version': _CACHE_VERSION,
+            'fingerprint': self._fingerprint,
+            'notes': {
+                note_id: {
+                    'src_hash': note['src_hash'],
+                    'links': note['links'],
+                    'html': note['html'],
+                    'diagrams': note.get('_diagrams', [])
+                }
+                for note_id, note in self.notes.items()
+            }
+        }
+        (self.output_dir / '.cache.json').write_bytes(_json_dumps(cache))
+
 def main():
     parser = argparse.ArgumentParser(description='Foam-style Static Site Generator')
     parser.add_argument('input', help='Input directory containing markdown files')
@@ -1336,7 +1923,7 @@ if __name__ == '__main__':
     main()
 
 # Requirements:
-# pip install markdown frontmatter jinja2 networkx beautifulsoup4
+# pip install markdown frontmatter jinja2 networkx
 
 # Usage:
 # python foam_ssg.py /path/to/notes -o /path/to/output
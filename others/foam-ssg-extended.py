@@ -8,25 +8,43 @@ Extended Foam SSG with additional features:
 - Table of contents
 """
 
+import heapq
+import re
 import yaml
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
+from functools import lru_cache
 from feedgen.feed import FeedGenerator
 from pygments import highlight
 from pygments.lexers import get_lexer_by_name
 from pygments.formatters import HtmlFormatter
+from pygments.util import ClassNotFound
 import urllib.parse
 
 # Import base SSG
 from foam_ssg import FoamSSG
 
+# Fenced code blocks, compiled once instead of per preprocessor run
+_FENCED_RE = re.compile(r'```(\w+)\n(.*?)\n```', re.DOTALL)
+
+# Formatter and lexers are deterministic and expensive to construct, so
+# share one formatter and memoize lexer lookups across all code blocks
+_FORMATTER = HtmlFormatter(style='monokai')
+
+@lru_cache(maxsize=64)
+def _get_lexer(lang):
+    return get_lexer_by_name(lang)
+
 class ExtendedFoamSSG(FoamSSG):
     def __init__(self, input_dir, output_dir, config_file=None):
         super().__init__(input_dir, output_dir)
         
         # Load configuration
         self.config = self.load_config(config_file)
+
+        # Search previews are truncated at note-load time in the base class
+        self.search_preview_length = self.config['search_preview_length']
         
         # Tag index
         self.tags = defaultdict(list)
@@ -135,15 +153,15 @@ class ExtendedFoamSSG(FoamSSG):
         fg.link(href=self.config['site_url'], rel='alternate')
         fg.language('en')
         
-        # Sort notes by date
-        sorted_notes = sorted(
+        # Partial sort: only the 20 newest notes make the feed
+        top_notes = heapq.nlargest(
+            20,
             self.notes.items(),
-            key=lambda x: x[1]['metadata'].get('date', datetime.min),
-            reverse=True
+            key=lambda x: x[1]['metadata'].get('date', datetime.min)
         )
-        
+
         # Add entries
-        for note_id, note in sorted_notes[:20]:  # Last 20 notes
+        for note_id, note in top_notes:
             fe = fg.add_entry()
             fe.title(note['title'])
             fe.link(href=f"{self.config['site_url']}/{note['url']}")
@@ -157,25 +175,31 @@ class ExtendedFoamSSG(FoamSSG):
     
     def generate_sitemap(self):
         """Generate XML sitemap"""
-        sitemap = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        sitemap += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-        
-        for note_id, note in self.notes.items():
-            sitemap += f'''  <url>
+        # Loop invariant: every entry carries the same build date
+        today = datetime.now().strftime('%Y-%m-%d')
+
+        # Collect fragments and join once instead of growing a string
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n',
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        ]
+
+        parts.extend(f'''  <url>
     <loc>{self.config['site_url']}/{note['url']}</loc>
-    <lastmod>{datetime.now().strftime('%Y-%m-%d')}</lastmod>
+    <lastmod>{today}</lastmod>
     <changefreq>weekly</changefreq>
-  </url>\n'''
-        
-        sitemap += '</urlset>'
-        
-        (self.output_dir / 'sitemap.xml').write_text(sitemap)
+  </url>\n''' for note in self.notes.values())
+
+        parts.append('</urlset>')
+
+        (self.output_dir / 'sitemap.xml').write_text(''.join(parts))
     
     def create_extended_template(self):
         """Create extended template with tag support"""
         # This would be an extended version of the base template
         # with additional features for tags, RSS, etc.
-        # For brevity, returning the base template
+        # For brevity, returning the base template, which is compiled once
+        # per class and cached, so calling this per tag page is cheap
         return self.create_template()
 
 
@@ -187,23 +211,18 @@ class SyntaxHighlightPreprocessor:
     def run(self, lines):
         """Process code blocks for syntax highlighting"""
         text = '\n'.join(lines)
-        
-        # Pattern for fenced code blocks
-        import re
-        pattern = r'```(\w+)\n(.*?)\n```'
-        
+
         def highlight_code(match):
             lang = match.group(1)
             code = match.group(2)
             
             try:
-                lexer = get_lexer_by_name(lang)
-                formatter = HtmlFormatter(style='monokai')
-                return highlight(code, lexer, formatter)
-            except:
+                lexer = _get_lexer(lang)
+            except ClassNotFound:
                 return f'<pre><code class="language-{lang}">{code}</code></pre>'
+            return highlight(code, lexer, _FORMATTER)
         
-        text = re.sub(pattern, highlight_code, text, flags=re.DOTALL)
+        text = _FENCED_RE.sub(highlight_code, text)
         return text.split('\n')
 
 